@@ -2,7 +2,9 @@
 
 import sounddevice as sd
 import numpy as np
-import time
+import threading
+
+from ring_buffer import AudioRingBuffer, DEFAULT_CAPACITY_SECONDS
 
 # --- 1. Define Parameters for the Audio Stream ---
 # Standard sampling rate for high-quality speech (you must match your model's requirement!)
@@ -14,8 +16,12 @@ BLOCKSIZE = int(SAMPLE_RATE * CHUNK_DURATION)
 # We only need one audio channel (mono)
 CHANNELS = 1
 
-# A list to store the captured audio chunks
-audio_buffer = []
+# A preallocated lock-free ring buffer to store the captured audio
+# Samples are stored as 16-bit integers: half the memory traffic of float32.
+audio_buffer = AudioRingBuffer(SAMPLE_RATE * DEFAULT_CAPACITY_SECONDS, dtype=np.int16)
+
+# Set by the callback whenever new audio has been written to the buffer
+data_ready = threading.Event()
 
 
 # --- 2. The Core Callback Function ---
@@ -23,16 +29,19 @@ audio_buffer = []
 def callback(indata, frames, time_info, status):
     """
     Called (from a separate thread) for each audio block.
-    indata: NumPy array containing the new audio data.
+    indata: raw CFFI buffer containing the new audio data (int16 samples).
     """
     if status:
         print(f"Audio Stream Warning: {status}", flush=True)
 
-    # Crucial step: Convert the raw sounddevice data (indata) into a float array
-    # and append it to our buffer for later processing.
-    # We must ensure the data type is compatible (e.g., float32).
-    # .copy() is used to ensure thread safety.
-    audio_buffer.append(indata.copy())
+    # Crucial step: View the raw sounddevice data (indata) as an int16 array
+    # (np.frombuffer does not copy) and write it into our ring buffer for later processing.
+    # No conversion or extra .copy() is needed: the ring write itself is the copy
+    # that makes it thread safe.
+    audio_buffer.write(np.frombuffer(indata, dtype=np.int16))
+
+    # Wake up the main thread: the new chunk is ready to be processed.
+    data_ready.set()
 
 
 # --- 3. The Main Streaming Function ---
@@ -40,23 +49,33 @@ def start_stream():
     """Starts the non-blocking audio recording stream."""
     print(f"Starting audio stream at {SAMPLE_RATE} Hz...")
 
-    # We use sd.InputStream to process chunks in real-time.
+    # We use sd.RawInputStream to process chunks in real-time.
+    # Unlike sd.InputStream, it passes the raw buffer to the callback instead of
+    # allocating a new NumPy array for every chunk.
     # The 'samplerate', 'blocksize', and 'channels' define the stream structure.
     # The 'callback' is the function executed on every new chunk.
-    with sd.InputStream(
+    with sd.RawInputStream(
         samplerate=SAMPLE_RATE,
         blocksize=BLOCKSIZE,
         channels=CHANNELS,
         callback=callback,
-        dtype="float32",  # Defines the data type of the input NumPy array
+        # 16-bit samples move half the bytes of float32; convert to float only when
+        # the audio is passed to a model.
+        dtype="int16",  # Defines the sample format of the raw input buffer
     ):
         print("Listening... Press Ctrl+C to stop.")
 
         # Keep the main thread alive so the audio stream thread can continue running
         while True:
-            # We can perform real-time ASR processing here, checking the audio_buffer
-            # For now, we'll just wait.
-            time.sleep(CHUNK_DURATION)
+            # Sleep until the callback signals new audio (no polling, no wasted wake-ups).
+            data_ready.wait()
+            # Clear before reading, so audio arriving while we process wakes us up again.
+            data_ready.clear()
+
+            # All audio captured since the last wake-up, as one contiguous view.
+            audio_data = audio_buffer.read()
+            # We can perform real-time ASR processing on audio_data here.
+            print(f"Captured {audio_data.shape[0] / SAMPLE_RATE:.2f} s of audio", flush=True)
 
 
 # --- 4. Execution ---
@@ -1,7 +1,18 @@
 # src/features.py
 
-import librosa
+import functools
+import importlib.util
+
 import numpy as np
+import scipy.fft
+
+# GPU support is optional: nnAudio (built on PyTorch) is only used when CUDA is available.
+# Only check here that both are installed (cheap); importing torch and setting up CUDA
+# is deferred to the first call, so importing this module stays fast.
+_GPU_LIBS_INSTALLED = (
+    importlib.util.find_spec("torch") is not None
+    and importlib.util.find_spec("nnAudio") is not None
+)
 
 # --- 1. Define Parameters (Must match the streaming parameters!) ---
 SAMPLE_RATE = 16000
@@ -11,9 +22,125 @@ N_FFT = 512
 HOP_LENGTH = 160
 # The number of Mel bins (N_MELS) is the final feature dimension.
 N_MELS = 80  # A common value for many ASR models (e.g., Whisper, Conformer)
+# Features more than TOP_DB below the loudest value are clipped.
+TOP_DB = 80.0
+# Smallest power value before taking the log, to avoid log(0).
+AMIN = 1e-10
+
+
+# --- 2. Precompute the Window and Mel Filterbank (once, at import) ---
+def _hz_to_mel(freqs: np.ndarray) -> np.ndarray:
+    """Slaney mel scale: linear below 1 kHz, logarithmic above (same as librosa's default)."""
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mels = freqs / (200.0 / 3)
+    log_region = freqs >= 1000.0
+    mels[log_region] = 15.0 + np.log(freqs[log_region] / 1000.0) / (np.log(6.4) / 27.0)
+    return mels
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    """Inverse of _hz_to_mel."""
+    mels = np.asarray(mels, dtype=np.float64)
+    freqs = mels * (200.0 / 3)
+    log_region = mels >= 15.0
+    freqs[log_region] = 1000.0 * np.exp((np.log(6.4) / 27.0) * (mels[log_region] - 15.0))
+    return freqs
+
+
+def mel_filters(sr: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """
+    Builds a Mel filterbank of triangular filters on the Slaney mel scale, with
+    Slaney area normalization. Matches librosa.filters.mel with its default arguments.
+
+    Returns:
+        np.ndarray: Filterbank with shape (n_mels, n_fft // 2 + 1).
+    """
+    # Center frequencies of the FFT bins, and n_mels + 2 filter edges evenly spaced in mels
+    fft_freqs = np.fft.rfftfreq(n_fft, d=1.0 / sr)
+    mel_freqs = _mel_to_hz(np.linspace(_hz_to_mel([0.0])[0], _hz_to_mel([sr / 2.0])[0], n_mels + 2))
+
+    # Rising and falling slopes of each triangle, evaluated at every FFT bin
+    fdiff = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+
+    # Normalize each filter to (approximately) constant energy per channel
+    weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:-2]))[:, None]
+    return weights
+
+
+@functools.lru_cache(maxsize=4)
+def _get_filters(sr: int, n_fft: int, n_mels: int) -> tuple:
+    """
+    Builds the STFT window and Mel filterbank for the given parameters.
+    Cached, so each parameter combination is only ever computed once.
+
+    Returns:
+        tuple: (window with shape (n_fft,), filterbank with shape (n_mels, n_fft // 2 + 1))
+    """
+    # Periodic Hann window (the standard choice for STFT analysis), built with NumPy
+    # alone so importing this module does not pull in scipy.signal.
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+    mel_fb = mel_filters(sr, n_fft, n_mels).astype(np.float32)
+    return window, mel_fb
+
+
+# The default parameters are looked up once here, so the hot path never calls _get_filters.
+_WINDOW, _MEL_FB = _get_filters(SAMPLE_RATE, N_FFT, N_MELS)
+# Transposed copy (Bins, Mels), so the projection directly produces (Frames, Mels).
+_MEL_FB_T = np.ascontiguousarray(_MEL_FB.T)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_gpu_mel():
+    """
+    Builds the GPU version of the same Mel Spectrogram (Hann window, centered frames,
+    Slaney mels) on first use. Returns None when CUDA is not available.
+    """
+    if not _GPU_LIBS_INSTALLED:
+        return None
+
+    import torch
+    from nnAudio.features import MelSpectrogram
+
+    if not torch.cuda.is_available():
+        return None
+    return MelSpectrogram(
+        sr=SAMPLE_RATE,
+        n_fft=N_FFT,
+        n_mels=N_MELS,
+        hop_length=HOP_LENGTH,
+        pad_mode="constant",
+        verbose=False,
+    ).cuda()
+
+
+# --- 3. The Short-Time Fourier Transform ---
+def _stft(audio: np.ndarray, window: np.ndarray, hop_length: int) -> np.ndarray:
+    """
+    Computes the STFT of a flat audio array with centered (zero-padded) frames.
+
+    Returns:
+        np.ndarray: Complex spectrum with shape (Frames, len(window) // 2 + 1).
+    """
+    n_fft = window.shape[0]
 
+    # Pad both ends by half a window so frames are centered.
+    padded = np.pad(audio, n_fft // 2)
 
-# --- 2. The Feature Extraction Function ---
+    # Slice the audio into overlapping frames. This is a strided view, not a copy.
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+
+    # Window every frame and take a real FFT (half the work of a complex FFT).
+    # scipy.fft runs one batched pocketfft call over the whole (Frames, N_FFT) matrix and
+    # keeps float32 input as complex64. The windowed frames are a temporary, so the FFT
+    # may overwrite them.
+    return scipy.fft.rfft(frames * window, axis=-1, overwrite_x=True)
+
+
+# --- 4. The Feature Extraction Function ---
 def extract_mel_spectrogram(audio_chunk: np.ndarray) -> np.ndarray:
     """
     Converts a raw audio NumPy array chunk into a Mel Spectrogram.
@@ -26,26 +153,76 @@ def extract_mel_spectrogram(audio_chunk: np.ndarray) -> np.ndarray:
         np.ndarray: A Mel Spectrogram feature matrix ready for the model.
     """
 
-    # 2a. Reshape and ensure the audio is mono (if necessary, though sounddevice handles it)
-    audio_chunk = audio_chunk.flatten()
+    # 4a. Reshape and ensure the audio is mono (if necessary, though sounddevice handles it)
+    # Everything stays float32 from here on, which halves memory traffic compared to float64.
+    # reshape/astype only copy when they have to (multi-channel shape or non-float32 input).
+    audio_chunk = audio_chunk.reshape(-1).astype(np.float32, copy=False)
 
-    # 2b. Compute the Mel Spectrogram using librosa
-    # sr=SAMPLE_RATE tells librosa the rate of the incoming audio.
-    mel_features = librosa.feature.melspectrogram(
-        y=audio_chunk, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS
-    )
+    # Use the GPU when available; everything below is the CPU fallback.
+    gpu_mel = _get_gpu_mel()
+    if gpu_mel is not None:
+        return _extract_mel_spectrogram_gpu(audio_chunk, gpu_mel)
 
-    # 2c. Convert power to decibels (dB). Models prefer features in a log-scale.
+    # 4b. Mel power spectrum, written into a preallocated (Time Steps, Feature Dimension)
+    # array, already in the layout ML models expect, so no final transpose is needed.
+    mel_db = np.empty((audio_chunk.shape[0] // HOP_LENGTH + 1, N_MELS), dtype=np.float32)
+    _mel_power(audio_chunk, mel_db)
+
+    # 4c. Convert power to decibels (dB). Models prefer features in a log-scale.
     # This step is critical for normalizing the sound's volume.
-    mel_db = librosa.power_to_db(mel_features, ref=np.max)
+    _power_to_db_inplace(mel_db)
+
+    # The final shape is (Time Steps, Feature Dimension), e.g., (X, 80)
+    return mel_db
+
+
+def _mel_power(audio: np.ndarray, out: np.ndarray) -> None:
+    """Computes the Mel power spectrum of flat float32 audio into `out` (Frames, N_MELS)."""
+    # STFT with the cached window. Output shape: (Frames, N_FFT // 2 + 1)
+    spec = _stft(audio, _WINDOW, HOP_LENGTH)
+
+    # Power spectrum, computed as real^2 + imag^2 (no sqrt/square of abs(z) ** 2).
+    power = (spec.real**2).astype(np.float32, copy=False)
+    power += spec.imag**2
+
+    # Project onto the Mel filterbank: (Frames, Bins) @ (Bins, Mels) -> (Frames, Mels)
+    np.matmul(power, _MEL_FB_T, out=out)
+
+
+def _power_to_db_inplace(mel: np.ndarray) -> None:
+    """
+    Converts Mel power to decibels relative to the loudest value (0 dB is the maximum),
+    clipped at -TOP_DB. Every step works in-place, so no temporary arrays are allocated.
+    """
+    np.maximum(mel, AMIN, out=mel)
+    np.log10(mel, out=mel)
+    mel *= 10.0
+    mel -= mel.max()
+    np.maximum(mel, -TOP_DB, out=mel)
+
+
+def _extract_mel_spectrogram_gpu(audio_chunk: np.ndarray, gpu_mel) -> np.ndarray:
+    """GPU version of extract_mel_spectrogram using nnAudio. Takes a flat float32 array."""
+    # Already imported by _get_gpu_mel, so this is just a lookup.
+    import torch
+
+    with torch.no_grad():
+        # The caller already made this a flat float32 array, so no conversion is needed.
+        audio_tensor = torch.from_numpy(audio_chunk).cuda()
+
+        # nnAudio returns (Batch, Mels, Frames); we have a batch of one.
+        mel_features = gpu_mel(audio_tensor)[0]
+
+        # Same in-place dB conversion as the CPU path, done on the GPU.
+        mel_db = mel_features.clamp_(min=AMIN).log10_().mul_(10.0)
+        mel_db -= mel_db.max()
+        mel_db.clamp_(min=-TOP_DB)
 
-    # 2d. Transpose the matrix.
-    # Librosa outputs (Mels, Frames), but ML models prefer (Frames, Mels).
-    # The final shape will be (Time Steps, Feature Dimension), e.g., (X, 80)
-    return mel_db.T
+        # Copy the (Frames, Mels) result back to the CPU.
+        return mel_db.T.contiguous().cpu().numpy()
 
 
-# --- 3. Simple Test Block ---
+# --- 5. Simple Test Block ---
 if __name__ == "__main__":
     # Create a dummy audio chunk (1 second of silence) for testing
     TEST_DURATION = 1.0
@@ -2,11 +2,14 @@
 
 import sounddevice as sd
 import numpy as np
-import time
+import os
+import threading
 
-# --- 1. Import Project Component ---
+# --- 1. Import Project Components ---
 # We import your transcription function from the other file you created
-from transcriber import transcribe_chunk
+from transcriber import transcribe_words, warmup
+from ring_buffer import AudioRingBuffer, DEFAULT_CAPACITY_SECONDS
+from vad import VoiceActivityDetector
 
 # --- 2. Define Streaming Parameters ---
 # These must match the sample rate expected by the Whisper model.
@@ -15,67 +18,225 @@ SAMPLE_RATE = 16000
 CHUNK_DURATION_SECONDS = 0.5
 BLOCKSIZE = int(SAMPLE_RATE * CHUNK_DURATION_SECONDS)
 CHANNELS = 1
-
-# List to store audio chunks received from the microphone
-audio_buffer = []
+# Audio is captured and buffered as 16-bit integers (half the bytes of float32)
+# and only converted to float32 right before it is handed to Whisper.
+INT16_SCALE = 1.0 / 32768.0
+
+# Rolling window: every STRIDE_SECONDS we transcribe the last WINDOW_SECONDS of audio.
+# The window has a fixed size, so each Whisper call costs the same however long we run.
+WINDOW_SECONDS = 5
+STRIDE_SECONDS = 1
+WINDOW_SAMPLES = SAMPLE_RATE * WINDOW_SECONDS
+# Words ending this close to the end of the window may be cut off mid-word,
+# so they are left for the next window, which contains them in full.
+EDGE_HOLDBACK_SECONDS = 0.5
+# When more than one window of audio has built up (e.g. while the model was loading),
+# the backlog is worked through in windows this far apart. Consecutive windows still
+# overlap by one stride, so held-back words are picked up by the next one.
+CATCHUP_STEP_SAMPLES = WINDOW_SAMPLES - SAMPLE_RATE * STRIDE_SECONDS
+
+# Minimum amount of new audio (in samples) before the transcription worker is woken up
+MIN_TRANSCRIBE_SAMPLES = SAMPLE_RATE * STRIDE_SECONDS
+# How much to lower the transcription worker's priority so it never competes with audio capture
+WORKER_NICE_INCREMENT = 5
+# How often the main thread wakes up while waiting, so Ctrl+C is handled on every platform
+JOIN_POLL_SECONDS = 0.5
+
+# Preallocated lock-free ring buffer holding the audio received from the microphone.
+# The callback is the only writer and the transcription worker is the only reader.
+audio_buffer = AudioRingBuffer(SAMPLE_RATE * DEFAULT_CAPACITY_SECONDS, dtype=np.int16)
+
+# Set by the callback once enough audio has accumulated for the worker to transcribe
+data_ready = threading.Event()
+# Set by the worker once the model is loaded and warmed up
+model_ready = threading.Event()
+
+# Preallocated float32 scratch buffer the worker converts each window into, so the
+# int16 -> float32 conversion does not allocate a new array on every stride.
+_scratch = np.empty(WINDOW_SAMPLES, dtype=np.float32)
 
 
 # --- 3. The Stream Callback Function (Runs in a separate thread) ---
 def callback(indata, frames, time_info, status):
     """
     Called automatically by sounddevice every time a new block of audio arrives.
+    indata: raw CFFI buffer holding `frames` int16 samples (mono).
     """
     if status:
         # Log any status warnings from the audio driver
         print(f"Audio Stream Status: {status}", flush=True)
 
-    # Append the new audio chunk to the buffer for the main thread to process.
-    # .copy() and .astype(np.float32) ensure thread safety and correct data format for Whisper.
-    audio_buffer.append(indata.copy().flatten().astype(np.float32))
+    # Wrap the raw buffer as an int16 array without copying, then copy it straight
+    # into the preallocated ring buffer. The ring write is the only copy.
+    audio_buffer.write(np.frombuffer(indata, dtype=np.int16))
+
+    # Wake up the transcription worker. The callback never transcribes itself,
+    # so audio capture keeps running even while Whisper is busy.
+    if audio_buffer.available() >= MIN_TRANSCRIBE_SAMPLES:
+        data_ready.set()
+
+
+# --- 4. The Transcription Worker (Runs on a lower-priority background thread) ---
+def preload_model():
+    """
+    Loads and warms up the Whisper model. Called from the transcription worker, so this
+    one-time work overlaps with audio capture instead of delaying the first transcription.
+    """
+    try:
+        warmup()
+    except Exception as e:
+        # The worker will retry loading the model on first use.
+        print(f"Model warmup failed: {e}")
+
+
+def transcribe_window(end_idx: int, hold_back: bool, emitted_until: float) -> float:
+    """
+    Transcribes the WINDOW_SECONDS of audio ending at stream position `end_idx` and
+    prints the words not printed before.
 
+    Args:
+        end_idx (int): Absolute stream position (in samples) where the window ends.
+        hold_back (bool): True if more speech follows, so words at the very end of the
+                          window are left for the next window, which contains them in full.
+        emitted_until (float): Stream time (in seconds) up to which words were printed.
+
+    Returns:
+        float: The updated emitted_until.
+    """
+    # Build the fixed-size window (a view, not a copy).
+    window = audio_buffer.latest(WINDOW_SAMPLES, end_idx)
+    if window.shape[0] == 0:
+        return emitted_until
+    window_start = (end_idx - window.shape[0]) / SAMPLE_RATE
+    window_duration = window.shape[0] / SAMPLE_RATE
+
+    # Convert to float32 in [-1, 1] once, at the model boundary, writing into the
+    # scratch buffer. The result is a C-contiguous 1D float32 view, as Whisper expects.
+    window = np.multiply(window, INT16_SCALE, out=_scratch[: window.shape[0]], dtype=np.float32)
+
+    # Transcribe the window and keep only the new words
+    try:
+        new_words = []
+        for start, end, word in transcribe_words(window):
+            # Skip words already printed from the previous (overlapping) window.
+            if window_start + (start + end) / 2 < emitted_until:
+                continue
+            if hold_back and end > window_duration - EDGE_HOLDBACK_SECONDS:
+                break
+            new_words.append(word)
+            emitted_until = window_start + end
+
+        transcribed_text = "".join(new_words).strip()
+        if transcribed_text:
+            # Print the result instantly!
+            print(f"LIVE TEXT: {transcribed_text}", flush=True)
 
-# --- 4. The Main Transcription Loop ---
+    except Exception as e:
+        # Catch and report transcription errors without halting the audio stream
+        print(f"Transcription Error: {e}")
+
+    return emitted_until
+
+
+def transcription_worker():
+    """
+    Waits for the callback to signal a new stride of audio, then transcribes the
+    rolling window(s) covering it and prints only the words not printed before.
+    """
+    try:
+        # On Linux, os.nice only affects the calling thread, so the audio thread keeps its priority.
+        os.nice(WORKER_NICE_INCREMENT)
+    except (AttributeError, OSError):
+        # os.nice is not available on every platform (e.g. Windows); run at normal priority.
+        pass
+
+    # Load the model from this (niced) thread: new threads inherit the priority of the
+    # thread that creates them, so CTranslate2's inference threads, created while the
+    # model is built, run at the lower priority too. Audio captured meanwhile is kept
+    # in the ring buffer and transcribed below.
+    preload_model()
+    model_ready.set()
+
+    # Silence is filtered out here, so Whisper only runs on actual speech.
+    vad = VoiceActivityDetector()
+    # Stream time (in seconds) up to which words have already been printed.
+    emitted_until = 0.0
+    # True while the last transcribed window held back words, so the next one must run.
+    speech_pending = False
+
+    while True:
+        # Sleep until the callback reports enough new audio (no polling).
+        data_ready.wait()
+        # Clear before reading, so audio arriving during transcription wakes us up again.
+        data_ready.clear()
+
+        # 4a. Take all new audio as one contiguous view (no concatenation).
+        # Reading also marks it as consumed, so nothing that arrives meanwhile is dropped.
+        previous_read_idx = audio_buffer.read_idx
+        new_audio = audio_buffer.read()
+        new_end = audio_buffer.read_idx
+        new_start = new_end - new_audio.shape[0]
+        if new_start > previous_read_idx:
+            # We fell more than the ring buffer's capacity behind: that audio is gone.
+            dropped = (new_start - previous_read_idx) / SAMPLE_RATE
+            print(f"Warning: transcription fell behind, {dropped:.1f} s of audio was dropped.", flush=True)
+
+        # 4b. Normally this is one stride and a single window covers it. After a backlog
+        # (model warmup, a slow Whisper call), walk through it in successive windows so
+        # none of it is skipped. emitted_until removes the words they have in common.
+        window_ends = list(range(new_start + WINDOW_SAMPLES, new_end, CATCHUP_STEP_SAMPLES))
+        window_ends.append(new_end)
+
+        step_start = new_start
+        for end_idx in window_ends:
+            # 4c. Run the VAD on the audio this window adds. If it is silent (and nothing
+            # is left over from the previous window), Whisper is not called at all.
+            voiced = vad.contains_speech(new_audio[step_start - new_start : end_idx - new_start])
+            step_start = end_idx
+            if not voiced and not speech_pending:
+                continue
+
+            # 4d. While the speaker is still talking (or more backlog follows), words at
+            # the very end of the window are left for the next window.
+            hold_back = voiced or end_idx < new_end
+            emitted_until = transcribe_window(end_idx, hold_back, emitted_until)
+            speech_pending = hold_back
+
+
+# --- 5. The Main Streaming Function ---
 def run_live_transcription():
-    """Starts the audio stream and continuously checks the buffer for new data to transcribe."""
+    """Starts the transcription worker and the audio stream, then waits until stopped."""
     print(f"Starting live Telugu ASR stream at {SAMPLE_RATE} Hz...")
 
-    # sd.InputStream runs the `callback` function asynchronously.
-    with sd.InputStream(
+    # The worker starts by loading (and warming up) the model, instead of on the first
+    # transcription. Daemon thread, so it stops automatically when the main thread exits (Ctrl+C).
+    worker = threading.Thread(target=transcription_worker, daemon=True)
+    worker.start()
+
+    # sd.RawInputStream runs the `callback` function asynchronously.
+    # It hands us the raw CFFI buffer, so sounddevice skips building a NumPy array per block.
+    with sd.RawInputStream(
         samplerate=SAMPLE_RATE,
         blocksize=BLOCKSIZE,
         channels=CHANNELS,
         callback=callback,
-        dtype="float32",
+        dtype="int16",
     ):
+        # Audio is already being captured (and will be transcribed), but only prompt the
+        # user once the model is ready, so the first words do not appear with a long delay.
+        print("Loading the Whisper model...")
+        while not model_ready.wait(timeout=JOIN_POLL_SECONDS):
+            pass
         print("\n--- SPEAK IN TELUGU NOW (Press Ctrl+C to stop) ---\n")
 
-        # This while loop runs continuously on the main thread
-        while True:
-            # Check if the separate audio thread has added any chunks to the buffer
-            if audio_buffer:
-                # 4a. Combine all chunks into one audio array
-                audio_data = np.concatenate(audio_buffer, axis=0)
-
-                # IMPORTANT: Clear the buffer immediately for the next incoming audio chunks
-                audio_buffer.clear()
-
-                # 4b. Transcribe the combined audio chunk
-                try:
-                    transcribed_text = transcribe_chunk(audio_data)
-
-                    if transcribed_text:
-                        # Print the result instantly!
-                        print(f"LIVE TEXT: {transcribed_text}", flush=True)
-
-                except Exception as e:
-                    # Catch and report transcription errors without halting the audio stream
-                    print(f"Transcription Error: {e}")
-
-            # Pause briefly to prevent high CPU usage, optimizing for low latency
-            time.sleep(CHUNK_DURATION_SECONDS / 4)
+        # The main thread has nothing else to do: wait until the worker exits or Ctrl+C.
+        # Join with a timeout, since an untimed join cannot be interrupted by Ctrl+C on
+        # Windows (before Python 3.14).
+        while worker.is_alive():
+            worker.join(timeout=JOIN_POLL_SECONDS)
 
 
-# --- 5. Execution ---
+# --- 6. Execution ---
 if __name__ == "__main__":
     try:
         run_live_transcription()
@@ -0,0 +1,87 @@
+# src/ring_buffer.py
+
+import numpy as np
+
+# --- 1. Define Parameters ---
+# Default capacity of the ring buffer in seconds of audio.
+# 30 seconds is far more than the consumer should ever fall behind.
+DEFAULT_CAPACITY_SECONDS = 30
+
+
+# --- 2. The Single-Producer / Single-Consumer Ring Buffer ---
+class AudioRingBuffer:
+    """
+    A fixed-capacity, lock-free ring buffer for mono audio samples.
+
+    Exactly one thread (the sounddevice callback) may call `write`, and exactly
+    one thread (the transcription loop) may call `read`. Each side only ever
+    updates its own index, so no lock is needed.
+
+    The storage is allocated twice as long as the capacity and every sample is
+    written to both halves ("mirrored"). This way any window of up to
+    `capacity` samples is always one contiguous slice, and `read` can return a
+    NumPy view instead of concatenating two pieces.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self.capacity = capacity
+        self._buf = np.zeros(2 * capacity, dtype=dtype)
+        # Total number of samples ever written / read (they only grow).
+        self.write_idx = 0
+        self.read_idx = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        """Copies new samples into the buffer. Called from the audio thread only."""
+        frames = samples.shape[0]
+        # Index of the first sample we actually store. Kept local: write_idx is only
+        # published once the samples are in place.
+        start = self.write_idx
+        if frames > self.capacity:
+            # Only the newest `capacity` samples can be kept anyway.
+            samples = samples[-self.capacity :]
+            start += frames - self.capacity
+            frames = self.capacity
+
+        cap = self.capacity
+        pos = start % cap
+        # Write the block once, starting in the first half...
+        self._buf[pos : pos + frames] = samples
+        # ...then mirror it into the other half (handling the wrap with two slices).
+        low = min(frames, cap - pos)
+        self._buf[pos + cap : pos + cap + low] = samples[:low]
+        self._buf[: frames - low] = samples[low:]
+
+        # Publish the new data only after it has been fully written.
+        self.write_idx = start + frames
+
+    def available(self) -> int:
+        """Number of samples written but not yet read."""
+        return min(self.write_idx - self.read_idx, self.capacity)
+
+    def read(self) -> np.ndarray:
+        """
+        Returns all unread samples as a contiguous view into the buffer.
+        Called from the consumer thread only.
+
+        If the consumer fell more than `capacity` samples behind, the oldest
+        samples have been overwritten and are skipped.
+        """
+        write_idx = self.write_idx
+        start = max(self.read_idx, write_idx - self.capacity)
+        pos = start % self.capacity
+        self.read_idx = write_idx
+        return self._buf[pos : pos + (write_idx - start)]
+
+    def latest(self, n: int, end_idx: int = None) -> np.ndarray:
+        """
+        Returns the last `n` samples handed out by `read` as a contiguous view, or the
+        `n` samples ending at stream position `end_idx` (which must not be past the
+        read position). Fewer are returned if not that many have been recorded yet, or
+        if the older ones have already been overwritten. Called from the consumer
+        thread only. Used for rolling windows that overlap audio that has already been read.
+        """
+        end = self.read_idx if end_idx is None else end_idx
+        oldest = max(0, self.write_idx - self.capacity)
+        n = max(0, min(n, end - oldest))
+        pos = (end - n) % self.capacity
+        return self._buf[pos : pos + n]
@@ -1,31 +1,114 @@
 # src/transcriber.py
 
 from faster_whisper import WhisperModel
+from faster_whisper.vad import get_vad_model
+import ctranslate2
+import functools
 import numpy as np
+import os
+import threading
 
 # --- 1. Model Parameters ---
+# Whisper expects 16 kHz audio.
+SAMPLE_RATE = 16000
 # Choose a model size. 'small' or 'base' are good starting points for low-latency.
 # 'medium' is more accurate but slower.
 MODEL_SIZE = "small"  # You can change this to "small" or "medium" later
+# Use the GPU automatically when CTranslate2 (the engine behind faster-whisper) can see one.
+DEVICE = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+# 'int8_float16' runs on the GPU's tensor cores. On CPU, 'int8_float32' keeps int8
+# weights (VNNI dot products on AVX2/AVX-512 CPUs) with float32 activations.
+COMPUTE_TYPE = "int8_float16" if DEVICE == "cuda" else "int8_float32"
+
+
+def _cpu_threads() -> int:
+    """
+    Number of CPU threads for inference. Defaults to the physical core count
+    (half the logical cores); set OMP_NUM_THREADS to override it. Values that are
+    not a single positive integer (e.g. "" or the nested form "4,2") use the default.
+    """
+    default = max(1, (os.cpu_count() or 2) // 2)
+    try:
+        threads = int(os.environ.get("OMP_NUM_THREADS", ""))
+    except ValueError:
+        return default
+    return threads if threads > 0 else default
+
+
+CPU_THREADS = _cpu_threads()
+# Live streaming transcribes one chunk at a time, so one worker is enough.
+NUM_WORKERS = 1
 
 # --- 2. Load the Model and Tokenizer ---
-# We load the model, which includes the ASR network AND the tokenizer.
-# The 'device' and 'compute_type' are crucial for speed (CPU is default).
-try:
-    # Use 'cpu' initially. If you have an NVIDIA GPU, use 'cuda'.
-    # Use 'int8' for faster inference on CPU.
-    model = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
-    print(f"Loaded Whisper model: {MODEL_SIZE} (int8 on CPU).")
-
-except Exception as e:
-    print(
-        f"Error loading Whisper model. Did you install faster-whisper and have internet? Error: {e}"
-    )
-    # You may need to ensure a stable internet connection for the first run,
-    # as the model weights are downloaded.
+# The model is loaded lazily on first use (not at import), so importing this module is
+# instant and callers can start loading it in the background while doing other work.
+# Guards against two threads loading the model at the same time.
+_model_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_model() -> WhisperModel:
+    # We load the model, which includes the ASR network AND the tokenizer.
+    # The 'device' and 'compute_type' are crucial for speed (CPU is the fallback).
+    try:
+        model = WhisperModel(
+            MODEL_SIZE,
+            device=DEVICE,
+            compute_type=COMPUTE_TYPE,
+            cpu_threads=CPU_THREADS,
+            num_workers=NUM_WORKERS,
+        )
+    except Exception as e:
+        print(
+            f"Error loading Whisper model. Did you install faster-whisper and have internet? Error: {e}"
+        )
+        # You may need to ensure a stable internet connection for the first run,
+        # as the model weights are downloaded.
+        # Re-raise: a failed load is not cached, so the next call tries again.
+        raise
+
+    print(f"Loaded Whisper model: {MODEL_SIZE} ({COMPUTE_TYPE} on {DEVICE.upper()}).")
+    return model
+
+
+def get_model() -> WhisperModel:
+    """Returns the Whisper model, loading it on the first call. Safe to call from any thread."""
+    with _model_lock:
+        return _load_model()
+
+
+# --- 3. The Core Transcription Functions ---
+# Decoding options shared by all transcription calls.
+TRANSCRIBE_OPTIONS = dict(
+    language="te",  # Crucial: Set the target language to Telugu
+    task="transcribe",
+    # Greedy decoding: for live ASR a single beam runs far fewer decoder steps than beam_size=5.
+    beam_size=1,
+    best_of=1,
+    temperature=0.0,
+    # Each chunk is independent, so do not feed the previous text back in as a prompt.
+    condition_on_previous_text=False,
+    # Silero VAD inside faster-whisper drops silent stretches before decoding.
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=300),
+    # Only sample text tokens (fewer decoder steps). Word timestamps, used by
+    # transcribe_words, come from a separate alignment step and are unaffected.
+    without_timestamps=True,
+)
+
+
+def _as_whisper_input(audio_chunk: np.ndarray) -> np.ndarray:
+    """
+    Whisper expects a flat 1D array of float32 data. Audio that already is one
+    (e.g. from the live stream) is passed through untouched, without a copy.
+    """
+    if audio_chunk.ndim > 1:
+        audio_chunk = audio_chunk.reshape(-1)
+    if audio_chunk.dtype != np.float32:
+        audio_chunk = audio_chunk.astype(np.float32, copy=False)
+    return audio_chunk
 
 
-# --- 3. The Core Transcription Function ---
 def transcribe_chunk(audio_chunk: np.ndarray) -> str:
     """
     Transcribes a raw audio chunk using the pre-trained Whisper model.
@@ -37,17 +120,11 @@ def transcribe_chunk(audio_chunk: np.ndarray) -> str:
         str: The transcribed Telugu text.
     """
 
-    # Whisper expects a flat 1D array of float32 data
-    audio_data = audio_chunk.flatten().astype(np.float32)
+    audio_data = _as_whisper_input(audio_chunk)
 
     # 3a. Run the transcription. We specify the language (Telugu) and the task.
     # We use segments, even for a chunk, to get the full transcription data.
-    segments, info = model.transcribe(
-        audio_data,
-        language="te",  # Crucial: Set the target language to Telugu
-        task="transcribe",
-        beam_size=5,  # Standard setting for better accuracy
-    )
+    segments, info = get_model().transcribe(audio_data, **TRANSCRIBE_OPTIONS)
 
     # 3b. Compile the transcribed text
     full_text = []
@@ -58,13 +135,54 @@ def transcribe_chunk(audio_chunk: np.ndarray) -> str:
     return " ".join(full_text).strip()
 
 
+def transcribe_words(audio_chunk: np.ndarray) -> list:
+    """
+    Transcribes a raw audio chunk and returns every word with its timestamps.
+
+    Args:
+        audio_chunk (np.ndarray): The raw audio array (must be 16000 Hz float32).
+
+    Returns:
+        list: (start, end, word) tuples, with times in seconds from the start of the chunk.
+              Each word keeps Whisper's leading space, so they can be joined with "".
+    """
+
+    audio_data = _as_whisper_input(audio_chunk)
+
+    segments, info = get_model().transcribe(
+        audio_data, word_timestamps=True, **TRANSCRIBE_OPTIONS
+    )
+
+    return [(word.start, word.end, word.word) for segment in segments for word in segment.words]
+
+
+def warmup() -> None:
+    """
+    Loads the model and runs one dummy transcription, so the one-time setup
+    (CTranslate2 kernels, thread pools, mel filters) happens before the first real
+    utterance instead of adding latency to it.
+    """
+    dummy_audio = np.zeros(SAMPLE_RATE, dtype=np.float32)
+
+    # The VAD filter would drop the silent dummy audio before decoding, so turn it off
+    # here. Word timestamps are on, so the alignment step used live is warmed up too.
+    options = dict(TRANSCRIBE_OPTIONS, vad_filter=False)
+    segments, info = get_model().transcribe(dummy_audio, word_timestamps=True, **options)
+
+    # Segments is a lazy generator: decoding only happens when we iterate it.
+    list(segments)
+
+    # With vad_filter off above, the Silero VAD session was never created. It is cached,
+    # so building it here keeps that setup off the first live (vad_filter=True) call too.
+    get_vad_model()
+
+
 # --- 4. Simple Test Block (Using dummy audio) ---
 if __name__ == "__main__":
     # NOTE: Since we don't have a real Telugu speaker input yet,
     # this test will check if the model system works.
 
     # Create a 3-second silence chunk
-    SAMPLE_RATE = 16000
     TEST_DURATION = 3.0
     TEST_FRAMES = int(SAMPLE_RATE * TEST_DURATION)
     dummy_audio = np.zeros((TEST_FRAMES, 1), dtype=np.float32)
@@ -0,0 +1,63 @@
+# src/vad.py
+
+import numpy as np
+
+# WebRTC VAD is optional: if it is not installed we fall back to a plain energy (RMS) gate.
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+# --- 1. Define Parameters (Must match the streaming parameters!) ---
+SAMPLE_RATE = 16000
+# WebRTC VAD only accepts 10, 20 or 30 ms frames.
+FRAME_DURATION_MS = 30
+FRAME_SIZE = SAMPLE_RATE * FRAME_DURATION_MS // 1000
+# 0 (least aggressive) to 3 (most aggressive about filtering out non-speech).
+VAD_AGGRESSIVENESS = 2
+# Frames quieter than this RMS (in int16 units, i.e. about 0.01 of full scale)
+# are treated as silence without running the VAD at all.
+RMS_THRESHOLD = 328
+# A piece of audio needs at least this many voiced frames to count as speech
+# (fewer are usually clicks or noise).
+MIN_VOICED_FRAMES = 3
+
+
+# --- 2. The Voice Activity Detector ---
+class VoiceActivityDetector:
+    """
+    Decides whether a piece of audio contains speech.
+
+    Audio is examined in 30 ms frames: an RMS check rejects quiet frames cheaply,
+    and WebRTC VAD (when installed) confirms the rest. This way the (expensive)
+    Whisper model is only run on audio that actually contains speech.
+    """
+
+    def __init__(self):
+        self._vad = webrtcvad.Vad(VAD_AGGRESSIVENESS) if webrtcvad is not None else None
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Returns True if a single FRAME_SIZE frame contains speech."""
+        # Cheap energy check first: quiet frames never reach the VAD.
+        # Square in float32: int16 * int16 would overflow.
+        samples = frame.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples))
+        if rms < RMS_THRESHOLD:
+            return False
+        if self._vad is None:
+            return True
+
+        # WebRTC VAD takes the 16-bit PCM bytes as they are.
+        return self._vad.is_speech(frame.tobytes(), SAMPLE_RATE)
+
+    def count_voiced_frames(self, audio: np.ndarray) -> int:
+        """Counts the voiced frames in 1D int16 audio. A trailing partial frame is ignored."""
+        n_frames = audio.shape[0] // FRAME_SIZE
+        return sum(
+            self.is_speech(audio[i * FRAME_SIZE : (i + 1) * FRAME_SIZE])
+            for i in range(n_frames)
+        )
+
+    def contains_speech(self, audio: np.ndarray) -> bool:
+        """Returns True if the audio has at least MIN_VOICED_FRAMES voiced frames."""
+        return self.count_voiced_frames(audio) >= MIN_VOICED_FRAMES
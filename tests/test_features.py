@@ -0,0 +1,53 @@
+# tests/test_features.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The modules in src/ import each other by plain name (e.g. `from transcriber import ...`).
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import features  # noqa: E402
+
+# librosa is no longer a dependency; it is only needed here as the reference.
+librosa = pytest.importorskip("librosa")
+
+
+@pytest.mark.parametrize(
+    "sr, n_fft, n_mels", [(16000, 512, 80), (16000, 400, 128), (22050, 2048, 40)]
+)
+def test_mel_filters_match_librosa(sr, n_fft, n_mels):
+    expected = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+    np.testing.assert_allclose(features.mel_filters(sr, n_fft, n_mels), expected, atol=1e-7)
+
+
+@pytest.mark.parametrize("length", [1, 100, 511, 512, 8000, 12345, 16000])
+def test_extract_mel_spectrogram_matches_librosa(length):
+    rng = np.random.default_rng(length)
+    audio = (0.1 * rng.standard_normal((length, 1))).astype(np.float32)
+
+    mel = librosa.feature.melspectrogram(
+        y=audio.flatten(),
+        sr=features.SAMPLE_RATE,
+        n_fft=features.N_FFT,
+        hop_length=features.HOP_LENGTH,
+        n_mels=features.N_MELS,
+    )
+    expected = librosa.power_to_db(mel, ref=np.max).T
+
+    result = features.extract_mel_spectrogram(audio)
+
+    assert result.shape == expected.shape
+    assert result.dtype == np.float32
+    assert result.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(result, expected, atol=1e-4)
+
+
+@pytest.mark.parametrize("length", [0, 1, 100, 511])
+def test_short_input_frame_count(length):
+    # Centered frames: one frame per hop, plus one, even when shorter than N_FFT.
+    result = features.extract_mel_spectrogram(np.zeros(length, dtype=np.float32))
+    assert result.shape == (length // features.HOP_LENGTH + 1, features.N_MELS)
+    assert np.all(np.isfinite(result))